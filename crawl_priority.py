@@ -0,0 +1,93 @@
+import os
+import time
+import pandas as pd
+
+PRIORITY_INDEX = 'PSXDIV20'
+
+
+def parse_percent(value):
+    try:
+        return float(str(value).replace('%', '').strip())
+    except ValueError:
+        return 0.0
+
+
+def load_previous_results(sectors, results_dir='sector_calculations'):
+    """
+    Read the last run's sector result files.
+    Returns: (previous_yields, sector_results)
+      previous_yields: {symbol: expected 2025 dividend %} for every symbol that qualified last time
+      sector_results: {sector: (qualified_count, file_age_days)} for sectors that have a result file
+    """
+    previous_yields = {}
+    sector_results = {}
+    now = time.time()
+
+    for sector in sectors:
+        path = os.path.join(results_dir, f'{sector}_with_dividends.csv')
+        if not os.path.exists(path):
+            continue
+        try:
+            results_df = pd.read_csv(path)
+        except Exception as e:
+            print(f"Warning: could not read previous results for {sector}: {str(e)}")
+            continue
+
+        for _, row in results_df.iterrows():
+            previous_yields[str(row['Symbol']).strip()] = parse_percent(row.get('ExpectedDividend2025_Percent', 0))
+
+        age_days = (now - os.path.getmtime(path)) / 86400
+        sector_results[sector] = (len(results_df), age_days)
+
+    return previous_yields, sector_results
+
+
+def load_index_members(path=f'psx_divident_data/{PRIORITY_INDEX}_index_constituents.csv'):
+    if not os.path.exists(path):
+        return set()
+    index_df = pd.read_csv(path)
+    return set(index_df['SYMBOL'].astype(str).str.strip())
+
+
+def symbol_priority(symbol, listed_in, previous_yields, index_members):
+    """
+    Sort key, compared as a tuple: previous qualifiers first, then index members;
+    expected yield only orders symbols within those groups.
+    """
+    was_previous_payer = symbol in previous_yields
+    is_index_member = symbol in index_members or PRIORITY_INDEX in str(listed_in)
+    return (was_previous_payer, is_index_member, previous_yields.get(symbol, 0.0))
+
+
+def plan_crawl(sector_frames, results_dir='sector_calculations', index_path=None, skip_stale_days=None):
+    """
+    Build one fetch queue across all sectors, ordered by the previous run's results and index membership.
+    sector_frames: {sector: listings DataFrame (Symbol, ..., Listed In)}
+    skip_stale_days: skip sectors where nothing qualified last run, unless those results are
+                     older than this many days. None crawls every sector.
+    Returns: (queue, skipped)
+      queue: [(sector, row index, symbol)] - priority symbols from every sector first
+      skipped: sectors left out because of skip_stale_days
+    """
+    sectors = list(sector_frames.keys())
+    previous_yields, sector_results = load_previous_results(sectors, results_dir)
+    index_members = load_index_members(index_path) if index_path else load_index_members()
+
+    queue = []
+    skipped = []
+    for sector, df in sector_frames.items():
+        if skip_stale_days is not None and sector in sector_results:
+            qualified_count, age_days = sector_results[sector]
+            if qualified_count == 0 and age_days < skip_stale_days:
+                print(f"⏭️ Skipping {sector}: no qualifiers in last run ({age_days:.0f} days ago)")
+                skipped.append(sector)
+                continue
+
+        for index, row in df.iterrows():
+            symbol = str(row['Symbol']).strip()
+            priority = symbol_priority(symbol, row.get('Listed In', ''), previous_yields, index_members)
+            queue.append((priority, sector, index, symbol))
+
+    # sorted() is stable with reverse=True, so equal priorities keep sector / file order
+    queue.sort(key=lambda item: item[0], reverse=True)
+    return [(sector, index, symbol) for _, sector, index, symbol in queue], skipped
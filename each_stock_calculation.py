@@ -1,16 +1,21 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 import pandas as pd
-import time
 import re
 from tqdm import tqdm
 from datetime import datetime
+from page_archive import open_driver
+from symbol_universe import load_universe
 
-# Setup driver
-driver = webdriver.Chrome()
+# Setup driver (live, record or replay - see page_archive.py)
+driver = open_driver('each_stock_calculation')
 
-# Load CSV
-df = pd.read_csv('data/psx_listings.csv')
+# Run date sets the consistency window; stored in the archive so a replay uses the recording's date
+run_date = driver.replayable('run-date', lambda: datetime.now().strftime('%Y-%m-%d'))
+current_year = run_date[:4]
+
+# Load symbol universe in listing order (the symbol list is stored in the archive, so replays see the same symbols)
+symbols = driver.replayable('symbols', lambda: load_universe().listing_frame()['Symbol'].tolist())
+df = pd.DataFrame({'Symbol': symbols})
 
 dividend_df = pd.DataFrame(columns=['Symbol', 'StockPrice', 'DividendYearsPaid', 'DivPerYearPattern', 'ConsistentPayer', 'YearlyYieldDetails', 'DividendAmountsPKR', 'ConsistencyScore', 'Remarks'])
 
@@ -101,7 +106,7 @@ for index, row in tqdm(df.iterrows(), total=len(df), desc='Processing Companies'
     try:
         print(f"\n🔍 Processing {symbol} → {url}")
         driver.get(url)
-        time.sleep(3)
+        driver.settle(3)
 
         # Extract Stock Price
         stock_price_elem = driver.find_element(By.CLASS_NAME, 'quote__close')
@@ -143,7 +148,6 @@ for index, row in tqdm(df.iterrows(), total=len(df), desc='Processing Companies'
         print("🧾 Dividends extracted:", dividends)
 
         # Enhanced Summary + Calculations
-        current_year = str(datetime.now().year)
         DividendYearsPaid = ', '.join(sorted(dividends.keys(), reverse=True))
         DivPerYearPattern = ', '.join([str(len(dividends[y])) for y in sorted(dividends.keys(), reverse=True)])
         
@@ -196,7 +200,7 @@ for index, row in tqdm(df.iterrows(), total=len(df), desc='Processing Companies'
         continue
 
 # Save result
-dividend_df.to_csv('psx_listings_with_dividends.csv', index=False, encoding='utf-8-sig')
+dividend_df.to_csv(driver.output_path('psx_listings_with_dividends.csv'), index=False, encoding='utf-8-sig')
 print('Done. Saved to psx_listings_with_dividends.csv')
 
 driver.quit()
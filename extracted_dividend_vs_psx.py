@@ -1,29 +1,32 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 import pandas as pd
-import time
+import io
+import os
 from tqdm import tqdm
-from sample import get_csv_filenames
+from page_archive import open_driver
+from symbol_universe import load_universe
 
 # Setup WebDriver
-driver = webdriver.Chrome()
+driver = open_driver('extracted_dividend_vs_psx')  # live, record or replay - see page_archive.py
 wait = WebDriverWait(driver, 10)
 
 # Go to the indices page
-driver.get("https://dps.psx.com.pk/indices")
+indices_url = "https://dps.psx.com.pk/indices"
+driver.get(indices_url)
 
 # Click on the PSXDIV20 link
 psxdiv20 = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "PSXDIV20")))
-psxdiv20.click()
+driver.click(psxdiv20, f'{indices_url}#PSXDIV20')
 
 # Wait for the table to load
-time.sleep(5)  # wait extra time to be sure all JS loads
+driver.settle(5)  # wait extra time to be sure all JS loads
 
 # Data storage
 data = []
+page = 1
 
 # Loop through all pages
 while True:
@@ -41,23 +44,42 @@ while True:
         if "disabled" in next_btn.get_attribute("class"):
             break  # End of pages
         else:
-            next_btn.click()
-            time.sleep(2)
+            page += 1
+            driver.click(next_btn, f'{indices_url}#PSXDIV20&page={page}')
+            driver.settle(2)
+    except KeyError:
+        # Replay: a page missing from the archive must fail loudly, not silently shorten the constituents list
+        raise
     except:
         break
 
+# Sector results from the previous stage; stored in the archive when recording so a replay matches the same rows
+def read_sector_results():
+    sector_results = {}
+    for sector in load_universe().sector_keys():
+        path = f'sector_calculations/{sector}_with_dividends.csv'
+        if os.path.exists(path):
+            with open(path, encoding='utf-8-sig') as f:
+                sector_results[sector] = f.read()
+        else:
+            sector_results[sector] = None
+    return sector_results
+
+sector_results = driver.replayable('sector-results', read_sector_results)
+
 # Close driver
 driver.quit()
 
 # Save data
 columns = ["SYMBOL", "NAME", "LDCP", "CURRENT", "CHANGE", "CHANGE(%)", "IDX_WTG(%)", "IDX_POINT", "VOLUME", "FREEFLOAT(M)", "MARKET_CAP(M)"]
 df = pd.DataFrame(data, columns=columns)
-df.to_csv("psx_divident_data/PSXDIV20_index_constituents.csv", index=False, encoding='utf-8-sig')
+constituents_path = driver.output_path("psx_divident_data/PSXDIV20_index_constituents.csv")
+df.to_csv(constituents_path, index=False, encoding='utf-8-sig')
 
 print("Data saved to PSXDIV20_index_constituents.csv")
 
 # read the csv file
-psx_df = pd.read_csv("psx_divident_data/PSXDIV20_index_constituents.csv")
+psx_df = pd.read_csv(constituents_path)
 
 # array_of_sectors = [
 #     'FERTILIZER', 
@@ -68,7 +90,7 @@ psx_df = pd.read_csv("psx_divident_data/PSXDIV20_index_constituents.csv")
 #     'PHARMACEUTICALS'
 # ]
 
-array_of_sectors = get_csv_filenames('sector_files')
+array_of_sectors = list(sector_results.keys())
 
 # Initialize list to store matching records
 matching_records = []
@@ -76,8 +98,11 @@ matching_records = []
 # Find existing same record in PSX20 AND EXTRACTED_SECTOR_DIVIDEND
 for sector in array_of_sectors:
     print(f"Processing sector: {sector}")
+    if sector_results[sector] is None:
+        print(f"Warning: File not found for sector {sector}")
+        continue
     try:
-        sector_df = pd.read_csv(f'sector_calculations/{sector}_with_dividends.csv')
+        sector_df = pd.read_csv(io.StringIO(sector_results[sector]))
         
         # Create a set of symbols from PSX dataframe for faster lookup
         psx_symbols = set(psx_df['SYMBOL'].str.strip())
@@ -120,9 +145,6 @@ for sector in array_of_sectors:
                 
                 matching_records.append(combined_record)
                 
-    except FileNotFoundError:
-        print(f"Warning: File not found for sector {sector}")
-        continue
     except Exception as e:
         print(f"Error processing sector {sector}: {str(e)}")
         continue
@@ -132,7 +154,7 @@ if matching_records:
     matching_df = pd.DataFrame(matching_records)
     
     # Save to CSV
-    output_filename = "psx_divident_data/psx_dividend_matching_records.csv"
+    output_filename = driver.output_path("psx_divident_data/psx_dividend_matching_records.csv")
     matching_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
     
     print(f"\nMatching records saved to: {output_filename}")
@@ -1,14 +1,13 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import pandas as pd
-import time
-import os
+from page_archive import open_driver
+from symbol_universe import SNAPSHOT_DIR, build_universe, save_universe
 
 # Initialize driver
-driver = webdriver.Chrome()  # or give path: Chrome(executable_path="your_path_to_chromedriver")
+driver = open_driver('listing_extraxctor')  # live, record or replay - see page_archive.py
 
 # Open URL
 url = 'https://dps.psx.com.pk/listings'
@@ -20,12 +19,13 @@ wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'table.dataTable')))
 
 # Extract data from all pages
 all_data = []
+page = 1
 
 while True:
     print("Processing page...")
 
     # Wait a bit to ensure page is ready
-    time.sleep(2)
+    driver.settle(2)
 
     # Get all rows of table body
     rows = driver.find_elements(By.CSS_SELECTOR, 'table.dataTable tbody tr')
@@ -52,27 +52,21 @@ while True:
     if 'disabled' in next_button.get_attribute('class'):
         break
     else:
-        next_button.click()
+        page += 1
+        driver.click(next_button, f'{url}#page={page}')
 
 # Save to CSV
 df = pd.DataFrame(all_data)
-df.to_csv('data/psx_listings.csv', index=False, encoding='utf-8-sig')
+listings_path = driver.output_path('data/psx_listings.csv')
+df.to_csv(listings_path, index=False, encoding='utf-8-sig')
 
 
-file_path = "data/psx_listings.csv"  # Replace with the actual file path if different
-df = pd.read_csv(file_path)
+# Build the shared symbol universe snapshot (sector-sorted, memory-mappable)
+# Other scripts slice sectors out of it instead of reading per-sector CSV files
+snapshot_dir = driver.output_path(SNAPSHOT_DIR)
+save_universe(build_universe(listings_path), snapshot_dir)
 
-# Create a folder to store the sector files
-output_folder = "sector_files"
-os.makedirs(output_folder, exist_ok=True)
-
-# Group by sector and save each group as a separate CSV file
-for sector, group in df.groupby('Sector'):
-    # Create a valid filename by replacing invalid characters
-    filename = sector.replace("/", "-").replace("\\", "-").replace(" ", "_") + ".csv"
-    group.to_csv(os.path.join(output_folder, filename), index=False)
-
-print(f"Files have been created in the '{output_folder}' folder.")
+print(f"Symbol universe snapshot saved to {snapshot_dir}")
 
 print("Done. Data saved to psx_listings.csv")
 
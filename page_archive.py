@@ -0,0 +1,241 @@
+import os
+import time
+import gzip
+import json
+import uuid
+import zlib
+import tempfile
+from datetime import datetime, timezone
+from selenium import webdriver
+
+# live: normal scraping | record: scrape and archive every page | replay: serve pages from an archive
+ARCHIVE_MODES = ['live', 'record', 'replay']
+ARCHIVE_MODE = os.environ.get('PSX_ARCHIVE_MODE', 'live')
+# Archive file to record into / replay from. When recording without it, a new file is created per run.
+ARCHIVE_PATH = os.environ.get('PSX_ARCHIVE')
+ARCHIVE_DIR = 'archives'
+# Replays write their outputs here (default: next to the archive) so live results are never overwritten
+REPLAY_OUTPUT_DIR = os.environ.get('PSX_REPLAY_OUTPUT')
+
+
+class PageArchiveWriter:
+    """
+    WARC-style archive: every page is its own gzip member, so any record can be
+    decompressed on its own. A sidecar .cdx index maps key -> (offset, length).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'ab')
+        self.index_file = open(path + '.cdx', 'a', encoding='utf-8')
+
+    def write(self, key, content, content_type='text/html'):
+        body = content.encode('utf-8')
+        # 'resource' records: the body is the rendered page itself, not an HTTP response
+        header = (
+            "WARC/1.0\r\n"
+            "WARC-Type: resource\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Target-URI: {key}\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode('utf-8')
+        member = gzip.compress(header + body + b"\r\n\r\n")
+
+        offset = self.file.tell()
+        self.file.write(member)
+        self.file.flush()
+        self.index_file.write(f"{key}\t{offset}\t{len(member)}\n")
+        self.index_file.flush()
+
+    def close(self):
+        self.file.close()
+        self.index_file.close()
+
+
+def parse_record(data):
+    """Split one decompressed record into (key, content)"""
+    header, _, rest = data.partition(b"\r\n\r\n")
+    fields = {}
+    for line in header.decode('utf-8').split("\r\n")[1:]:
+        name, _, value = line.partition(': ')
+        fields[name] = value
+    body = rest[:int(fields['Content-Length'])]
+    return fields['WARC-Target-URI'], body.decode('utf-8')
+
+
+class PageArchiveReader:
+    """
+    Random access to an archive by key. Uses the .cdx index, or rebuilds it by
+    walking the gzip members if the index is missing. Later records win.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        if os.path.exists(path + '.cdx'):
+            self.index = self.load_index(path + '.cdx')
+        else:
+            self.index = self.scan()
+
+    def load_index(self, index_path):
+        index = {}
+        with open(index_path, encoding='utf-8') as f:
+            for line in f:
+                key, offset, length = line.rstrip('\n').rsplit('\t', 2)
+                index[key] = (int(offset), int(length))
+        return index
+
+    def scan(self):
+        index = {}
+        data = memoryview(self.file.read())
+        pos = 0
+        while pos < len(data):
+            decompressor = zlib.decompressobj(wbits=31)
+            # memoryview slice - no copy of the rest of the archive per record
+            record = decompressor.decompress(data[pos:])
+            length = len(data) - pos - len(decompressor.unused_data)
+            key, _ = parse_record(record)
+            index[key] = (pos, length)
+            pos += length
+        return index
+
+    def get(self, key):
+        if key not in self.index:
+            raise KeyError(f"Page not in archive {self.path}: {key}")
+        offset, length = self.index[key]
+        self.file.seek(offset)
+        _, content = parse_record(gzip.decompress(self.file.read(length)))
+        return content
+
+    def close(self):
+        self.file.close()
+
+
+class ArchiveDriver:
+    """
+    Wraps the Chrome driver so scrapers can run live, record, or replay without changes to their parsing.
+    Scrapers use get() / settle() / click() for navigation; everything else (find_element, ...) is passed through.
+    In replay mode archived pages are opened in headless Chrome with JavaScript off and settle() does not wait.
+    Run inputs that are not pages (crawl plan, symbol lists, ...) go through replayable(), and outputs
+    through output_path(), so a replay is repeatable and never touches the live result files.
+    """
+
+    def __init__(self, mode='live', archive_path=None, run_name='run'):
+        if mode not in ARCHIVE_MODES:
+            raise ValueError(f"Unknown archive mode {mode!r}, expected one of {ARCHIVE_MODES}")
+        self.mode = mode
+        self.run_name = run_name
+        self.current_key = None
+        self.captured = True
+        self.archive = None
+
+        if mode == 'replay':
+            if not archive_path:
+                raise ValueError("Replay mode needs an archive path (set PSX_ARCHIVE)")
+            self.archive = PageArchiveReader(archive_path)
+            self.driver = webdriver.Chrome(options=replay_options())
+            self.replay_file = tempfile.NamedTemporaryFile(suffix='.html', delete=False)
+            self.replay_file.close()
+            self.output_dir = REPLAY_OUTPUT_DIR or archive_path.replace('.warc.gz', '') + '_replay'
+            print(f"📼 Replaying {archive_path}, outputs go to {self.output_dir}")
+        else:
+            self.driver = webdriver.Chrome()
+            if mode == 'record':
+                self.archive = PageArchiveWriter(archive_path)
+                print(f"📼 Recording pages to {archive_path}")
+
+    def __getattr__(self, name):
+        if name == 'driver':
+            raise AttributeError(name)
+        return getattr(self.driver, name)
+
+    def get(self, url):
+        self.current_key = url
+        if self.mode == 'replay':
+            self.load(url)
+        else:
+            self.driver.get(url)
+            self.captured = False
+
+    def settle(self, seconds):
+        """Wait for the page to finish rendering, then archive it when recording"""
+        if self.mode == 'replay':
+            return
+        time.sleep(seconds)
+        self.capture()
+
+    def click(self, element, key):
+        """Click a navigation element; key names the resulting page in the archive"""
+        if self.mode == 'replay':
+            self.current_key = key
+            self.load(key)
+            return
+        if not self.captured:
+            self.capture()
+        element.click()
+        self.current_key = key
+        self.captured = False
+
+    def capture(self):
+        if self.mode == 'record':
+            self.archive.write(self.current_key, self.driver.page_source)
+        self.captured = True
+
+    def replayable(self, name, compute):
+        """
+        JSON-serialisable run input: computed (and archived when recording) normally,
+        read back from the archive when replaying.
+        """
+        key = f"urn:psx:{self.run_name}:{name}"
+        if self.mode == 'replay':
+            return json.loads(self.archive.get(key))
+        value = compute()
+        if self.mode == 'record':
+            self.archive.write(key, json.dumps(value), 'application/json')
+        return value
+
+    def output_path(self, path):
+        """Where to write an output file - unchanged, except under the replay output directory when replaying"""
+        if self.mode != 'replay':
+            return path
+        full_path = os.path.join(self.output_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        return full_path
+
+    def load(self, key):
+        with open(self.replay_file.name, 'w', encoding='utf-8') as f:
+            f.write(self.archive.get(key))
+        self.driver.get('file://' + os.path.abspath(self.replay_file.name))
+
+    def quit(self):
+        self.driver.quit()
+        if self.archive:
+            self.archive.close()
+        if self.mode == 'replay':
+            os.remove(self.replay_file.name)
+
+
+def replay_options():
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    # Archived pages are already rendered; don't run their scripts or fetch images again
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.javascript': 2,
+        'profile.managed_default_content_settings.images': 2
+    })
+    return options
+
+
+def open_driver(run_name):
+    """
+    Driver for a scraper run, configured by PSX_ARCHIVE_MODE / PSX_ARCHIVE.
+    Recording without PSX_ARCHIVE writes archives/<run_name>_<timestamp>.warc.gz
+    """
+    archive_path = ARCHIVE_PATH
+    if ARCHIVE_MODE == 'record' and not archive_path:
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        archive_path = os.path.join(ARCHIVE_DIR, f"{run_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.warc.gz")
+    return ArchiveDriver(ARCHIVE_MODE, archive_path, run_name)
@@ -0,0 +1,144 @@
+from collections import Counter
+import pandas as pd
+
+MARKET_ROW = 'ALL_SECTORS'
+
+SUMMARY_COLUMNS = ['Sector', 'Status', 'SymbolsProcessed', 'Errors', 'ConsistentPayers', 'QualifiedSymbols', 'AvgExpectedYield2025_Percent', 'MedianConsistencyScore']
+
+
+class SectorStats:
+    """
+    Running statistics for one sector, updated one symbol at a time.
+    Two instances can be merged, so results from parallel workers combine exactly.
+    """
+
+    def __init__(self):
+        self.symbols = 0
+        # Symbols whose page could not be fetched or parsed - not part of the other numbers
+        self.errors = 0
+        self.consistent_payers = 0
+        self.qualified = 0
+        self.yield_total = 0.0
+        # Consistency scores are bucketed in tenths of a percent (same precision as the CSV output)
+        self.score_counts = Counter()
+
+    def add(self, consistency_score, is_consistent, expected_yield=None):
+        """
+        Record one processed symbol.
+        expected_yield is the expected 2025 dividend % for symbols that made it into the sector file, else None.
+        """
+        self.symbols += 1
+        if is_consistent:
+            self.consistent_payers += 1
+        if expected_yield is not None:
+            self.qualified += 1
+            self.yield_total += expected_yield
+        self.score_counts[round(consistency_score * 10)] += 1
+
+    def add_error(self):
+        self.errors += 1
+
+    def merge(self, other):
+        self.symbols += other.symbols
+        self.errors += other.errors
+        self.consistent_payers += other.consistent_payers
+        self.qualified += other.qualified
+        self.yield_total += other.yield_total
+        self.score_counts.update(other.score_counts)
+        return self
+
+    def average_yield(self):
+        return self.yield_total / self.qualified if self.qualified else 0.0
+
+    def median_score(self):
+        total = sum(self.score_counts.values())
+        if not total:
+            return 0.0
+
+        # Walk the buckets in order to find the middle value(s), matching statistics.median
+        lower_rank = (total - 1) // 2
+        upper_rank = total // 2
+        lower = upper = None
+        seen = 0
+        for bucket in sorted(self.score_counts):
+            seen += self.score_counts[bucket]
+            if lower is None and seen > lower_rank:
+                lower = bucket
+            if seen > upper_rank:
+                upper = bucket
+                break
+        return (lower + upper) / 20
+
+
+class SectorAggregates:
+    """
+    Per-sector SectorStats plus a market-wide roll-up.
+    """
+
+    def __init__(self):
+        self.sectors = {}
+        # Sectors not crawled this run - listed in the summary so the market row isn't silently partial
+        self.skipped = []
+
+    def skip(self, sector):
+        if sector not in self.skipped:
+            self.skipped.append(sector)
+
+    def stats(self, sector):
+        if sector not in self.sectors:
+            self.sectors[sector] = SectorStats()
+        return self.sectors[sector]
+
+    def add(self, sector, consistency_score, is_consistent, expected_yield=None):
+        self.stats(sector).add(consistency_score, is_consistent, expected_yield)
+
+    def add_error(self, sector):
+        self.stats(sector).add_error()
+
+    def merge(self, other):
+        for sector, stats in other.sectors.items():
+            self.stats(sector).merge(stats)
+        for sector in other.skipped:
+            self.skip(sector)
+        return self
+
+    def market(self):
+        total = SectorStats()
+        for stats in self.sectors.values():
+            total.merge(stats)
+        return total
+
+    def to_frame(self, completed=None, total=None):
+        """
+        completed / total: sectors finished so far and sectors planned for this run.
+        While completed < total the market row is marked as in progress.
+        """
+        rows = []
+        for sector, stats in sorted(self.sectors.items()):
+            rows.append(self.summary_row(sector, 'Processed', stats))
+        for sector in sorted(self.skipped):
+            rows.append([sector, 'Skipped (no qualifiers last run)', 0, 0, 0, 0, '', ''])
+
+        if completed is not None and completed < total:
+            market_status = f"In progress ({completed}/{total} sectors)"
+        elif self.skipped:
+            market_status = f"Partial ({len(self.skipped)} sectors skipped)"
+        else:
+            market_status = 'Complete'
+        rows.append(self.summary_row(MARKET_ROW, market_status, self.market()))
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+    def summary_row(self, sector, status, stats):
+        return [
+            sector,
+            status,
+            stats.symbols,
+            stats.errors,
+            stats.consistent_payers,
+            stats.qualified,
+            f"{stats.average_yield():.2f}%",
+            f"{stats.median_score():.1f}%"
+        ]
+
+    def save(self, path, completed=None, total=None):
+        self.to_frame(completed, total).to_csv(path, index=False, encoding='utf-8-sig')
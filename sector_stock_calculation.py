@@ -1,15 +1,21 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 import pandas as pd
-import time
 import re
 from tqdm import tqdm
 from datetime import datetime
+from page_archive import open_driver
 import statistics
-from sample import get_csv_filenames
+from collections import Counter
+from symbol_universe import load_universe
+from sector_aggregates import SectorAggregates
+from crawl_priority import plan_crawl
 
-# Setup driver
-driver = webdriver.Chrome()
+# Setup driver (live, record or replay - see page_archive.py)
+driver = open_driver('sector_stock_calculation')
+
+# Run date sets the consistency window; stored in the archive so a replay uses the recording's date
+run_date = driver.replayable('run-date', lambda: datetime.now().strftime('%Y-%m-%d'))
+current_year = run_date[:4]
 
 # array_of_sectors = [
 #     'FERTILIZER', 
@@ -20,7 +26,12 @@ driver = webdriver.Chrome()
 #     'PHARMACEUTICALS'
 # ]
 
-array_of_sectors = get_csv_filenames('sector_files')
+# Optionally skip sectors where nothing qualified last run (e.g. mutual funds / ETFs) until
+# their results are older than this many days, e.g. 30. None crawls every sector.
+SKIP_UNQUALIFIED_SECTORS_DAYS = None
+
+# Running per-sector / market-wide statistics, updated as each symbol completes
+aggregates = SectorAggregates()
 
 # Helper to extract % from Details column
 def extract_dividend_percent(details):
@@ -28,7 +39,7 @@ def extract_dividend_percent(details):
     return float(match.group(1)) if match else 0.0
 
 # Function to calculate expected dividend for 2025
-def calculate_expected_dividend_2025(dividends, stock_price):
+def calculate_expected_dividend_2025(dividends, stock_price, current_year):
     """
     Calculate expected dividend for 2025 based on past dividend history
     Returns: (expected_dividend_pkr, expected_dividend_percent, calculation_method)
@@ -37,7 +48,6 @@ def calculate_expected_dividend_2025(dividends, stock_price):
         return 0.0, 0.0, "No dividend history"
     
     # Get all dividend years excluding current year
-    current_year = str(datetime.now().year)
     dividend_years = [y for y in dividends.keys() if y != current_year]
     
     if len(dividend_years) < 2:
@@ -176,120 +186,157 @@ def check_dividend_consistency(dividends, current_year):
     
     return is_consistent, consistency_score, remarks
 
-for sector in array_of_sectors:
-    df = pd.read_csv(f'sector_files/{sector}.csv')
-    dividend_df = pd.DataFrame(columns=['Symbol', 'StockPrice', 'DividendYearsPaid', 'DivPerYearPattern', 'ConsistentPayer', 'YearlyYieldDetails', 'DividendAmountsPKR', 'ConsistencyScore', 'Remarks', 'ExpectedDividend2025_PKR', 'ExpectedDividend2025_Percent', 'CalculationMethod'])
-    # Go through each company
-    for index, row in tqdm(df.iterrows(), total=len(df), desc='Processing Companies'):
-        symbol = row['Symbol']
-        url = f'https://dps.psx.com.pk/company/{symbol}'
-
-        try:
-            print(f"\n🔍 Processing {symbol} → {url}")
-            driver.get(url)
-            time.sleep(3)
-
-            # Extract Stock Price
-            stock_price_elem = driver.find_element(By.CLASS_NAME, 'quote__close')
-            print("📈 Raw stock price text:", stock_price_elem.text)
-            cleaned_price = stock_price_elem.text.replace('Rs.', '').replace(',', '').strip()
-            stock_price = float(cleaned_price)
-            print("✅ Parsed stock price:", stock_price)
-
-            # Try to locate the payout table
-            payouts_section = driver.find_element(By.ID, 'payouts')
-            print("✅ Payouts section found.")
-
-            payouts_rows = payouts_section.find_elements(By.CSS_SELECTOR, 'tbody tr')
-            print(f"📊 Found {len(payouts_rows)} payout rows.")
-
-            dividends = {}
-
-            for r in payouts_rows:
-                cols = r.find_elements(By.TAG_NAME, 'td')
-                print("   ➖ Row data:", [c.text.strip() for c in cols])
-                if len(cols) >= 3:
-                    fin_result = cols[1].text.strip()
-                    details = cols[2].text.strip()
-
-                    year_match = re.search(r'(\d{4})', fin_result)
-                    if year_match:
-                        year = year_match.group(1)
-                    else:
-                        date_text = cols[0].text.strip()
-                        year_match = re.search(r'(\d{4})', date_text)
-                        year = year_match.group(1) if year_match else 'Unknown'
-
-                    dividend_percent = extract_dividend_percent(details)
-
-                    if year not in dividends:
-                        dividends[year] = []
-                    dividends[year].append(dividend_percent)
-
-            print("🧾 Dividends extracted:", dividends)
-
-            # Enhanced Summary + Calculations
-            current_year = str(datetime.now().year)
-            DividendYearsPaid = ', '.join(sorted(dividends.keys(), reverse=True))
-            DivPerYearPattern = ', '.join([str(len(dividends[y])) for y in sorted(dividends.keys(), reverse=True)])
-            
-            # Enhanced consistency check
-            is_consistent, consistency_score, consistency_remarks = check_dividend_consistency(dividends, current_year)
-            ConsistentPayer = 'Yes' if is_consistent else 'No'
+# Fetch order: previous consistent payers, PSXDIV20 members and high yielders first, across all sectors
+def build_crawl_plan():
+    universe = load_universe()
+    array_of_sectors = universe.sector_keys()
+    sector_frames = {sector: universe.sector(sector) for sector in array_of_sectors}
+    queue, skipped = plan_crawl(sector_frames, skip_stale_days=SKIP_UNQUALIFIED_SECTORS_DAYS)
+    return {
+        'queue': [[sector, int(index), symbol] for sector, index, symbol in queue],
+        'skipped': skipped
+    }
 
-            # Calculate expected dividend for 2025
-            expected_dividend_pkr, expected_dividend_percent, calculation_method = calculate_expected_dividend_2025(dividends, stock_price)
+# The plan is stored in the archive when recording, so a replay crawls in exactly the same order
+crawl = driver.replayable('crawl-plan', build_crawl_plan)
+crawl_queue = crawl['queue']
+for sector in crawl['skipped']:
+    aggregates.skip(sector)
 
-            # Calculate yearly yield details and dividend amounts in PKR
-            YearlyYieldDetails = []
-            DividendAmountsPKR = []
-            
-            for y in sorted(dividends.keys(), reverse=True):
-                total_div = sum(dividends[y])
-                dividend_amount_pkr = total_div / 10  # Convert to PKR
-                yield_percent = (dividend_amount_pkr / stock_price) * 100
-                
-                YearlyYieldDetails.append(f'{y}: {yield_percent:.2f}%')
-                DividendAmountsPKR.append(f'{y}: Rs.{dividend_amount_pkr:.2f}')
-            
-            YearlyYieldDetails_str = ' | '.join(YearlyYieldDetails)
-            DividendAmountsPKR_str = ' | '.join(DividendAmountsPKR)
+# Results are kept per sector; a sector file is rewritten whenever it gains a row and once its last symbol is done
+remaining = Counter(sector for sector, _, _ in crawl_queue)
+sector_dividends = {
+    sector: pd.DataFrame(columns=['Symbol', 'StockPrice', 'DividendYearsPaid', 'DivPerYearPattern', 'ConsistentPayer', 'YearlyYieldDetails', 'DividendAmountsPKR', 'ConsistencyScore', 'Remarks', 'ExpectedDividend2025_PKR', 'ExpectedDividend2025_Percent', 'CalculationMethod'])
+    for sector in remaining
+}
+total_sectors = len(remaining)
+completed_sectors = 0
 
-            # Enhanced remarks
-            Remarks = consistency_remarks
-            
-            # Only add companies that are consistent AND have recent dividends (2024 or 2025)
-            if ConsistentPayer == 'Yes':
-                # Check if company has paid dividends in 2024 or 2025
-                recent_dividend_years = [y for y in dividends.keys() if y in ['2024', '2025']]
-                if recent_dividend_years:
-                    dividend_df.loc[index] = [
-                        symbol, 
-                        stock_price, 
-                        DividendYearsPaid, 
-                        DivPerYearPattern, 
-                        ConsistentPayer, 
-                        YearlyYieldDetails_str, 
-                        DividendAmountsPKR_str,
-                        f"{consistency_score:.1f}%",
-                        Remarks,
-                        f"Rs.{expected_dividend_pkr:.2f}",
-                        f"{expected_dividend_percent:.2f}%",
-                        calculation_method
-                    ]
+def save_sector(sector):
+    # Listing order in the file, whatever order the symbols were fetched in
+    sector_dividends[sector].sort_index().to_csv(driver.output_path(f'sector_calculations/{sector}_with_dividends.csv'), index=False, encoding='utf-8-sig')
+
+# Go through each company
+for sector, index, symbol in tqdm(crawl_queue, desc='Processing Companies'):
+    dividend_df = sector_dividends[sector]
+    url = f'https://dps.psx.com.pk/company/{symbol}'
+    qualified = False
+
+    try:
+        print(f"\n🔍 Processing {symbol} → {url}")
+        driver.get(url)
+        driver.settle(3)
+
+        # Extract Stock Price
+        stock_price_elem = driver.find_element(By.CLASS_NAME, 'quote__close')
+        print("📈 Raw stock price text:", stock_price_elem.text)
+        cleaned_price = stock_price_elem.text.replace('Rs.', '').replace(',', '').strip()
+        stock_price = float(cleaned_price)
+        print("✅ Parsed stock price:", stock_price)
+
+        # Try to locate the payout table
+        payouts_section = driver.find_element(By.ID, 'payouts')
+        print("✅ Payouts section found.")
+
+        payouts_rows = payouts_section.find_elements(By.CSS_SELECTOR, 'tbody tr')
+        print(f"📊 Found {len(payouts_rows)} payout rows.")
+
+        dividends = {}
+
+        for r in payouts_rows:
+            cols = r.find_elements(By.TAG_NAME, 'td')
+            print("   ➖ Row data:", [c.text.strip() for c in cols])
+            if len(cols) >= 3:
+                fin_result = cols[1].text.strip()
+                details = cols[2].text.strip()
+
+                year_match = re.search(r'(\d{4})', fin_result)
+                if year_match:
+                    year = year_match.group(1)
                 else:
-                    print(f"⚠️ Skipping {symbol}: Consistent but no recent dividends (2024/2025)")
-            else:
-                print(f"⚠️ Skipping {symbol}: Not consistent payer")
+                    date_text = cols[0].text.strip()
+                    year_match = re.search(r'(\d{4})', date_text)
+                    year = year_match.group(1) if year_match else 'Unknown'
+
+                dividend_percent = extract_dividend_percent(details)
+
+                if year not in dividends:
+                    dividends[year] = []
+                dividends[year].append(dividend_percent)
+
+        print("🧾 Dividends extracted:", dividends)
+
+        # Enhanced Summary + Calculations
+        DividendYearsPaid = ', '.join(sorted(dividends.keys(), reverse=True))
+        DivPerYearPattern = ', '.join([str(len(dividends[y])) for y in sorted(dividends.keys(), reverse=True)])
+        
+        # Enhanced consistency check
+        is_consistent, consistency_score, consistency_remarks = check_dividend_consistency(dividends, current_year)
+        ConsistentPayer = 'Yes' if is_consistent else 'No'
+
+        # Calculate expected dividend for 2025
+        expected_dividend_pkr, expected_dividend_percent, calculation_method = calculate_expected_dividend_2025(dividends, stock_price, current_year)
+
+        # Calculate yearly yield details and dividend amounts in PKR
+        YearlyYieldDetails = []
+        DividendAmountsPKR = []
+        
+        for y in sorted(dividends.keys(), reverse=True):
+            total_div = sum(dividends[y])
+            dividend_amount_pkr = total_div / 10  # Convert to PKR
+            yield_percent = (dividend_amount_pkr / stock_price) * 100
             
+            YearlyYieldDetails.append(f'{y}: {yield_percent:.2f}%')
+            DividendAmountsPKR.append(f'{y}: Rs.{dividend_amount_pkr:.2f}')
+        
+        YearlyYieldDetails_str = ' | '.join(YearlyYieldDetails)
+        DividendAmountsPKR_str = ' | '.join(DividendAmountsPKR)
+
+        # Enhanced remarks
+        Remarks = consistency_remarks
+        
+        # Only add companies that are consistent AND have recent dividends (2024 or 2025)
+        if ConsistentPayer == 'Yes':
+            # Check if company has paid dividends in 2024 or 2025
+            recent_dividend_years = [y for y in dividends.keys() if y in ['2024', '2025']]
+            if recent_dividend_years:
+                qualified = True
+                dividend_df.loc[index] = [
+                    symbol, 
+                    stock_price, 
+                    DividendYearsPaid, 
+                    DivPerYearPattern, 
+                    ConsistentPayer, 
+                    YearlyYieldDetails_str, 
+                    DividendAmountsPKR_str,
+                    f"{consistency_score:.1f}%",
+                    Remarks,
+                    f"Rs.{expected_dividend_pkr:.2f}",
+                    f"{expected_dividend_percent:.2f}%",
+                    calculation_method
+                ]
+            else:
+                print(f"⚠️ Skipping {symbol}: Consistent but no recent dividends (2024/2025)")
+        else:
+            print(f"⚠️ Skipping {symbol}: Not consistent payer")
+
+        # Update sector statistics with this symbol's result
+        aggregates.add(sector, consistency_score, is_consistent, expected_dividend_percent if qualified else None)
+        
+
+    except Exception as e:
+        print(f"❌ Error processing {symbol}: {str(e)}")
+        aggregates.add_error(sector)
 
-        except Exception as e:
-            print(f"❌ Error processing {symbol}: {str(e)}")
-            continue
+    remaining[sector] -= 1
+    if remaining[sector] == 0:
+        completed_sectors += 1
+        print(f'Done. Saved to {sector}_with_dividends.csv')
 
-    # Save result
-    dividend_df.to_csv(f'sector_calculations/{sector}_with_dividends.csv', index=False, encoding='utf-8-sig')
-    print(f'Done. Saved to {sector}_with_dividends.csv')
+    if qualified or remaining[sector] == 0:
+        save_sector(sector)
+        # Summary table is rebuilt from the accumulators, no need to re-read the sector files
+        aggregates.save(driver.output_path('sector_calculations/sector_summary.csv'), completed_sectors, total_sectors)
 
 
 driver.quit()
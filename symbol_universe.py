@@ -0,0 +1,149 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+LISTINGS_PATH = 'data/psx_listings.csv'
+SNAPSHOT_DIR = 'data/psx_universe'
+
+SNAPSHOT_ARRAYS = ['symbols', 'names', 'sector_codes', 'sectors', 'shares', 'listed_in', 'offsets', 'listing_rows']
+
+
+def sector_key(sector):
+    """
+    File-style sector name, e.g. 'INV. BANKS / INV. COS.' -> 'INV._BANKS_-_INV._COS.'
+    Matches the names used for sector_calculations/.
+    """
+    return sector.replace("/", "-").replace("\\", "-").replace(" ", "_")
+
+
+class SymbolUniverse:
+    """
+    Compact listing of every PSX symbol, sorted by sector.
+    Rows of one sector are contiguous, so offsets[i]:offsets[i + 1] is the row range of sectors[i].
+    listing_rows[i] is the row's position in data/psx_listings.csv, so listing order can be restored.
+    Arrays may be memory-mapped from a snapshot. In sector frames the Shares column is a view on
+    the shares array, and the Sector column's Categorical wraps a view of sector_codes
+    (df['Sector'].array.codes; the .cat.codes accessor returns a copy). Text columns are
+    converted to Python strings.
+    """
+
+    def __init__(self, symbols, names, sector_codes, sectors, shares, listed_in, offsets, listing_rows):
+        self.symbols = symbols
+        self.names = names
+        self.sector_codes = sector_codes
+        self.sectors = sectors
+        self.shares = shares
+        self.listed_in = listed_in
+        self.offsets = offsets
+        self.listing_rows = listing_rows
+        self._ranges = {}
+        for i, sector in enumerate(sectors):
+            row_range = (int(offsets[i]), int(offsets[i + 1]))
+            self._ranges[str(sector)] = row_range
+            self._ranges[sector_key(str(sector))] = row_range
+        self._frame = None
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def sector_names(self):
+        return [str(s) for s in self.sectors]
+
+    def sector_keys(self):
+        return [sector_key(str(s)) for s in self.sectors]
+
+    def sector_range(self, sector):
+        """Row range (start, stop) for a sector, by listing name or file-style key"""
+        return self._ranges[sector]
+
+    def rows(self, start, stop):
+        """DataFrame for rows start:stop, built on slices of the arrays (index = row position)"""
+        return pd.DataFrame({
+            'Symbol': self.symbols[start:stop].astype(object),
+            'Name': self.names[start:stop].astype(object),
+            'Sector': pd.Categorical.from_codes(self.sector_codes[start:stop], categories=self.sector_names()),
+            'Shares': self.shares[start:stop],
+            'Listed In': self.listed_in[start:stop].astype(object)
+        }, index=pd.RangeIndex(start, stop), copy=False)
+
+    def frame(self):
+        """Whole universe as a DataFrame (built once, then reused)"""
+        if self._frame is None:
+            self._frame = self.rows(0, len(self))
+        return self._frame
+
+    def listing_frame(self):
+        """Whole universe in data/psx_listings.csv order, indexed by CSV row like a plain read_csv"""
+        order = np.argsort(self.listing_rows, kind='stable')
+        return self.frame().iloc[order].set_axis(pd.RangeIndex(len(order)))
+
+    def sector(self, sector):
+        """Rows of one sector, sliced from the arrays instead of read from a separate file"""
+        start, stop = self.sector_range(sector)
+        return self.rows(start, stop)
+
+
+def build_universe(csv_path=LISTINGS_PATH):
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    df['Sector'] = df['Sector'].str.strip()
+    # Index still holds the CSV row of each listing after the sort
+    df = df.sort_values('Sector', kind='stable')
+
+    sectors = np.array(sorted(df['Sector'].unique()))
+    # Same code width pandas uses for Categorical, so from_codes() can wrap the array without copying
+    code_dtype = np.int8 if len(sectors) < 128 else np.int16
+    sector_codes = np.searchsorted(sectors, df['Sector'].to_numpy(dtype=str)).astype(code_dtype)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(sector_codes, minlength=len(sectors)))]).astype(np.int64)
+
+    shares = pd.to_numeric(df['Shares'].str.replace(',', ''), errors='coerce').fillna(0).astype(np.int64).to_numpy()
+
+    return SymbolUniverse(
+        symbols=df['Symbol'].str.strip().to_numpy(dtype=str),
+        names=df['Name'].str.strip().to_numpy(dtype=str),
+        sector_codes=sector_codes,
+        sectors=sectors,
+        shares=shares,
+        listed_in=df['Listed In'].str.strip().to_numpy(dtype=str),
+        offsets=offsets,
+        listing_rows=df.index.to_numpy(dtype=np.int64)
+    )
+
+
+def save_universe(universe, snapshot_dir=SNAPSHOT_DIR):
+    # Write into a temp directory and swap it in, so a crash never leaves a half-written snapshot
+    tmp_dir = snapshot_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name in SNAPSHOT_ARRAYS:
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), np.asarray(getattr(universe, name)))
+
+    old_dir = snapshot_dir + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(snapshot_dir):
+        os.replace(snapshot_dir, old_dir)
+    os.replace(tmp_dir, snapshot_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def snapshot_is_fresh(csv_path=LISTINGS_PATH, snapshot_dir=SNAPSHOT_DIR):
+    paths = [os.path.join(snapshot_dir, f'{name}.npy') for name in SNAPSHOT_ARRAYS]
+    if not all(os.path.exists(p) for p in paths):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return min(os.path.getmtime(p) for p in paths) >= os.path.getmtime(csv_path)
+
+
+def load_universe(csv_path=LISTINGS_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Load the symbol universe, memory-mapping the binary snapshot when it is newer than the listings CSV.
+    Otherwise the CSV is parsed once and the snapshot is (re)written for later loads.
+    """
+    if snapshot_is_fresh(csv_path, snapshot_dir):
+        arrays = {name: np.load(os.path.join(snapshot_dir, f'{name}.npy'), mmap_mode='r') for name in SNAPSHOT_ARRAYS}
+        return SymbolUniverse(**arrays)
+
+    universe = build_universe(csv_path)
+    save_universe(universe, snapshot_dir)
+    return universe